@@ -5,8 +5,26 @@ AI package provides functionality that runs the agent pipeline to detect
 texts in a receipt, analyze them and translate into preferred language.
 """
 
+from backend.ai.assistants import AssistantUnavailableError
+from backend.ai.assistants import Deadline
+from backend.ai.assistants import DeadlineExceededError
+from backend.ai.assistants import JobCancelledError
+from backend.ai.consistency import ConsistencyScorer
+from backend.ai.consistency import StageGate
+from backend.ai.consistency import load_wordlist
+from backend.ai.servicer import PipelineStages
 from backend.ai.servicer import run_pipeline
+from backend.ai.servicer import run_stages
 
 __all__ = [
+    "AssistantUnavailableError",
+    "ConsistencyScorer",
+    "Deadline",
+    "DeadlineExceededError",
+    "JobCancelledError",
+    "PipelineStages",
+    "StageGate",
+    "load_wordlist",
     "run_pipeline",
+    "run_stages",
 ]
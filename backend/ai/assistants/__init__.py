@@ -1,11 +1,27 @@
 """Assistants package provides LLM agents for ReceiptDetective to work."""
 
 from backend.ai.assistants.analyzer import AnalyzerAssistant
+from backend.ai.assistants.base import AssistantUnavailableError
+from backend.ai.assistants.clients import ClientPool
+from backend.ai.assistants.deadline import Deadline
+from backend.ai.assistants.deadline import DeadlineExceededError
+from backend.ai.assistants.deadline import JobCancelledError
 from backend.ai.assistants.ocr import OcrAssistant
+from backend.ai.assistants.prompt import PromptTemplate
+from backend.ai.assistants.registry import AssistantRegistry
+from backend.ai.assistants.registry import get_registry
 from backend.ai.assistants.translator import TranslatorAssistant
 
 __all__ = [
     "AnalyzerAssistant",
+    "AssistantRegistry",
+    "AssistantUnavailableError",
+    "ClientPool",
+    "Deadline",
+    "DeadlineExceededError",
+    "JobCancelledError",
     "OcrAssistant",
+    "PromptTemplate",
     "TranslatorAssistant",
+    "get_registry",
 ]
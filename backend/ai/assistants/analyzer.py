@@ -6,16 +6,23 @@ looks for the problems in the receipt OCR and solves if something
 seems different. It is a truth-check model on top of vision model.
 """
 
+from typing import TYPE_CHECKING
 from typing import Any
 
-import ollama
 from pydantic import BaseModel
 
 from backend.ai.assistants.base import AssistantBase
 from backend.ai.assistants.base import AssistantSettings
+from backend.ai.assistants.base import AssistantUnavailableError
 from backend.ai.assistants.base import ModelAccessType
+from backend.ai.assistants.clients import SHARED_CLIENT_POOL
+from backend.ai.assistants.clients import ClientPool
+from backend.ai.assistants.deadline import Deadline
 from backend.ai.datatypes.ocr_response import OcrResponse
 
+if TYPE_CHECKING:
+    import ollama
+
 ANALYZER_DEFAULT_SETTINGS: AssistantSettings = AssistantSettings(
     model="llama3.1:8b",
     prompt_file="backend/ai/prompts/analyzer.txt",
@@ -33,19 +40,27 @@ class AnalyzerAssistant(AssistantBase):
     SERIALIZED_OBJECT_PLACEHOLDER: str = "{% SERIALIZED_OBJECT_JSON %}"
     PRODUCTS_LIST_PLACEHOLDER: str = "{% PRODUCT_LIST %}"
 
-    def __init__(self, settings: AssistantSettings = ANALYZER_DEFAULT_SETTINGS) -> None:
+    def __init__(
+        self,
+        settings: AssistantSettings = ANALYZER_DEFAULT_SETTINGS,
+        clients: ClientPool = SHARED_CLIENT_POOL,
+    ) -> None:
         """Construct the analyzer assistant that detects problems in the receipt.
 
         :param settings: A settings object for LLM agent.
+        :param clients: The pool of LLM clients. Defaults to the shared pool.
         """
-        super().__init__(settings)
+        super().__init__(settings, clients)
 
-    def ask(self, input_data: dict[str, Any]) -> BaseModel:
+    def ask(self, input_data: dict[str, Any], deadline: Deadline | None = None) -> BaseModel:
         """Query the LLM agent with a given OCR result.
 
         :param input_data: The JSON string of the OCR result.
+        :param deadline: The job deadline bounding the requests. Defaults to no limit.
         :raises NotImplementedError: If the model access type is not OLLAMA.
-        :raises RuntimeError: If the model server is not reachable.
+        :raises AssistantUnavailableError: If the model server is not reachable.
+        :raises JobCancelledError: The job is cancelled by the caller.
+        :raises DeadlineExceededError: The job deadline is exceeded.
         :raises ValueError: If the expected input is not available in the param.
         :raises TypeError: If the ocr_result is not a BaseModel instance.
         :returns: A BaseModel object, a better OCR Response
@@ -55,10 +70,11 @@ class AnalyzerAssistant(AssistantBase):
             error_msg: str = "The OcrAssistant is only support OLLAMA accesses."
             raise NotImplementedError(error_msg)
 
-        # Check if model is accessible.
-        if not self.heartbeat():
+        # Check if model is accessible within the job deadline.
+        deadline = deadline or Deadline()
+        if not self.heartbeat(deadline):
             error_msg: str = f"The {self._settings.access.name} is not accessible."
-            raise RuntimeError(error_msg)
+            raise AssistantUnavailableError(error_msg)
 
         # Check the input_data format.
         if "ocr_result" not in input_data:
@@ -78,22 +94,28 @@ class AnalyzerAssistant(AssistantBase):
 
         # Convert BaseModel to string to provide with prompt.
         product_abbrvs: str = "".join([f"- {abbrv.name}\n" for abbrv in ocr_result.products])
-        content: str = self._settings.prompt.replace(self.PRODUCTS_LIST_PLACEHOLDER, product_abbrvs).replace(
-            self.SERIALIZED_OBJECT_PLACEHOLDER,
-            ocr_result.model_dump_json(),
+        content: str = self._settings.template.render(
+            {
+                self.PRODUCTS_LIST_PLACEHOLDER: product_abbrvs,
+                self.SERIALIZED_OBJECT_PLACEHOLDER: ocr_result.model_dump_json(),
+            },
         )
 
         # Send the OCR request to agent.
-        response: ollama.ChatResponse = ollama.chat(
-            model=self._settings.model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": content,
-                    "options": {"temperature": 0},
-                },
-            ],
-            format=self._settings.response_model_json,
+        response: ollama.ChatResponse = deadline.request(
+            self.__class__.__name__,
+            lambda client: client.chat(
+                model=self._settings.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": content,
+                        "options": {"temperature": 0},
+                    },
+                ],
+                format=self._settings.response_model_json,
+            ),
+            self._clients,
         )
 
         # Check if content is received.
@@ -6,17 +6,25 @@ base class below. Furthermore, each assistant must follow the
 input and output patterns.
 """
 
+import threading
 from abc import ABC
 from abc import abstractmethod
 from enum import Enum
 from enum import auto
 from enum import unique
+from functools import cache
 from pathlib import Path
 from typing import Any
 
-import ollama
 from pydantic import BaseModel
 
+from backend.ai.assistants.clients import SHARED_CLIENT_POOL
+from backend.ai.assistants.clients import ClientPool
+from backend.ai.assistants.deadline import Deadline
+from backend.ai.assistants.deadline import DeadlineExceededError
+from backend.ai.assistants.deadline import JobCancelledError
+from backend.ai.assistants.prompt import PromptTemplate
+
 
 @unique
 class ModelAccessType(int, Enum):
@@ -28,6 +36,16 @@ class ModelAccessType(int, Enum):
     OLLAMA = auto()
 
 
+@cache
+def response_model_schema(model_type: type[BaseModel]) -> dict[str, Any]:
+    """Return the JSON schema of a response model, generated once per model.
+
+    :param model_type: A BaseModel class.
+    :return: The JSON schema of the model as dict.
+    """
+    return model_type.model_json_schema()
+
+
 class AssistantSettings:
     """A Settings Class for Assistant Constructions"""
 
@@ -47,6 +65,9 @@ class AssistantSettings:
         self.model: str = model
         self.access: ModelAccessType = access
         self._prompt_file: str = prompt_file
+        self._template: PromptTemplate | None = None
+        self._template_stamp: tuple[int, int] | None = None
+        self._template_lock: threading.Lock = threading.Lock()
 
     @property
     def prompt(self) -> str:
@@ -55,19 +76,41 @@ class AssistantSettings:
         :raise ValueError: When no prompt file exists or given.
         :return: The system prompt as string
         """
-        # Read the prompt file and return its contents.
+        return self.template.text
+
+    @property
+    def template(self) -> PromptTemplate:
+        """This property returns the compiled prompt of the given prompt file.
+
+        The prompt file is read once, and read again only when its
+        modification time or size changes.
+
+        :raise ValueError: When no prompt file exists or given.
+        :return: The compiled system prompt.
+        """
         if not self._prompt_file:
             error_msg: str = "Prompt file is missing."
             raise ValueError(error_msg)
 
         file_path: Path = Path(self._prompt_file)
         try:
-            with Path.open(file_path, "r", encoding="utf-8") as f:
-                return f.read()
+            stat = file_path.stat()
         except FileNotFoundError as err:
             error_msg: str = f"Prompt file {file_path} is not found."
             raise ValueError(error_msg) from err
 
+        stamp: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+        with self._template_lock:
+            if self._template is None or self._template_stamp != stamp:
+                try:
+                    with Path.open(file_path, "r", encoding="utf-8") as f:
+                        self._template = PromptTemplate(f.read())
+                except FileNotFoundError as err:
+                    error_msg: str = f"Prompt file {file_path} is not found."
+                    raise ValueError(error_msg) from err
+                self._template_stamp = stamp
+            return self._template
+
     @property
     def response_model_json(self) -> dict[str, Any]:
         """This property getter returns the respose model as JSON/dict.
@@ -108,40 +151,53 @@ class AssistantSettings:
         :param model: A BaseModel instance
         """
         self._response_model_type: type[BaseModel] = model_type
-        self._response_model_json = model_type.model_json_schema()
+        self._response_model_json = response_model_schema(model_type)
+
+
+class AssistantUnavailableError(RuntimeError):
+    """This class represents an LLM server that does not answer the heartbeat."""
 
 
 class AssistantBase(ABC):
     """This class is a base class that interfaces how assistants configured."""
 
-    def __init__(self, settings: AssistantSettings) -> None:
+    def __init__(self, settings: AssistantSettings, clients: ClientPool = SHARED_CLIENT_POOL) -> None:
         """Construct an assistant from the settings.
 
         :param settings: AssistantSettings instance
+        :param clients: The pool of LLM clients. Defaults to the shared pool.
         """
         self._settings: AssistantSettings = settings
+        self._clients: ClientPool = clients
 
     @abstractmethod
-    def ask(self, input_data: dict[str, Any]) -> BaseModel:
+    def ask(self, input_data: dict[str, Any], deadline: Deadline | None = None) -> BaseModel:
         """Communicate with the LLM agent.
 
         :param input_data: Data to sent the LLM agent.
+        :param deadline: The job deadline bounding the request. Defaults to no limit.
         :returns: The response as BaseModel in structured form.
         """
         error_msg: str = "Abstract Method is not implemented yet."
         raise NotImplementedError(error_msg)
 
-    def heartbeat(self) -> bool:
+    def heartbeat(self, deadline: Deadline | None = None) -> bool:
         """Check if model is alive to recieve inputs.
 
+        :param deadline: The job deadline bounding the check. Defaults to no limit.
+        :raise JobCancelledError: The job is cancelled.
+        :raise DeadlineExceededError: The budget is spent.
         :return: True if alive, False if not.
         """
         if self._settings.access != ModelAccessType.OLLAMA:
             error_msg: str = "The selected access type is not implemented yet."
             raise NotImplementedError(error_msg)
 
+        deadline = deadline or Deadline()
         try:
-            ollama.list()
+            deadline.request(f"{self.__class__.__name__} heartbeat", lambda client: client.list(), self._clients)
+        except (DeadlineExceededError, JobCancelledError):
+            raise
         except Exception:  # noqa: BLE001
             return False
         return True
@@ -0,0 +1,100 @@
+"""
+This module provides the pool of LLM clients shared by the assistants.
+
+The requests run on ollama async clients, on an event loop that the
+pool runs in its own thread. Cancelling a request cancels its task,
+which tears down the HTTP connection it uses, so the LLM server sees
+the disconnect. The clients are kept after a successful request, so
+the following requests reuse their open connections.
+"""
+
+import asyncio
+import threading
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import TypeVar
+
+import httpx
+import ollama
+
+T = TypeVar("T")
+
+
+class ClientPool:
+    """A pool of idle ollama async clients, living on a single event loop."""
+
+    def __init__(self, host: str | None = None, max_idle: int = 4) -> None:
+        """Construct an empty client pool.
+
+        :param host: The ollama host. Defaults to the OLLAMA_HOST environment.
+        :param max_idle: The number of idle clients to keep.
+        """
+        self._host: str | None = host
+        self._max_idle: int = max_idle
+        # The idle clients are only touched from the event loop thread.
+        self._idle: list[ollama.AsyncClient] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock: threading.Lock = threading.Lock()
+
+    def submit(self, func: Callable[[ollama.AsyncClient], Awaitable[T]], timeout: float | None) -> Future[T]:
+        """Run a request on the event loop of the pool.
+
+        Cancelling the returned future cancels the request, and closes its client.
+
+        :param func: The request to run with the given client.
+        :param timeout: The HTTP timeout of the client in seconds.
+        :return: The future of the request result.
+        """
+        return asyncio.run_coroutine_threadsafe(self._run(func, timeout), self._event_loop())
+
+    def acquire(self, timeout: float | None) -> ollama.AsyncClient:
+        """Take a client from the pool, or create one if none is idle.
+
+        :param timeout: The HTTP timeout of the client in seconds.
+        :return: A client owned by the caller until released or discarded.
+        """
+        if not self._idle:
+            return ollama.AsyncClient(host=self._host, timeout=timeout)
+        client: ollama.AsyncClient = self._idle.pop()
+        client._client.timeout = httpx.Timeout(timeout)  # noqa: SLF001
+        return client
+
+    async def release(self, client: ollama.AsyncClient) -> None:
+        """Return a healthy client to the pool.
+
+        :param client: A client taken from this pool.
+        """
+        if len(self._idle) < self._max_idle:
+            self._idle.append(client)
+            return
+        await self.discard(client)
+
+    async def discard(self, client: ollama.AsyncClient) -> None:
+        """Close a client whose connection state is unknown.
+
+        :param client: A client taken from this pool.
+        """
+        await client._client.aclose()  # noqa: SLF001
+
+    async def _run(self, func: Callable[[ollama.AsyncClient], Awaitable[T]], http_timeout: float | None) -> T:
+        """Run a request with a pooled client, and discard the client on any failure."""
+        client: ollama.AsyncClient = self.acquire(http_timeout)
+        try:
+            result: T = await func(client)
+        except BaseException:
+            await self.discard(client)
+            raise
+        await self.release(client)
+        return result
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        """Return the event loop of the pool, starting its thread on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-clients", daemon=True).start()
+            return self._loop
+
+
+SHARED_CLIENT_POOL: ClientPool = ClientPool()
@@ -0,0 +1,135 @@
+"""
+This module provides the deadline shared by the assistants of a job.
+
+A deadline is created once per job and passed through every assistant
+in the chain. Each assistant uses the remaining budget as the HTTP
+timeout of its LLM request, and refuses to start once the budget is
+spent. Cancelling the deadline from another thread releases the caller
+at once, and cancels the request that is in flight, so its connection
+to the LLM server is closed. The same happens when the budget runs out.
+"""
+
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import wait
+from typing import TypeVar
+
+import httpx
+import ollama
+
+from backend.ai.assistants.clients import SHARED_CLIENT_POOL
+from backend.ai.assistants.clients import ClientPool
+
+T = TypeVar("T")
+
+
+class DeadlineExceededError(TimeoutError):
+    """This class represents a job that ran out of its time budget."""
+
+
+class JobCancelledError(RuntimeError):
+    """This class represents a job that is cancelled by its caller."""
+
+
+class Deadline:
+    """A time budget and cancellation token for a single job."""
+
+    def __init__(self, timeout: float | None = None) -> None:
+        """Construct a deadline that expires after the given seconds.
+
+        :param timeout: The budget in seconds. None means no time limit.
+        :raise ValueError: The timeout is not positive.
+        """
+        if timeout is not None and timeout <= 0:
+            error_msg: str = "The timeout should be a positive number of seconds."
+            raise ValueError(error_msg)
+
+        self._expires_at: float | None = None if timeout is None else time.monotonic() + timeout
+        self._cancelled: Future[None] = Future()
+        self._lock: threading.Lock = threading.Lock()
+
+    def remaining(self) -> float | None:
+        """Return the remaining budget in seconds.
+
+        :return: Seconds left, never negative. None if there is no time limit.
+        """
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        """This property tells if the budget is spent."""
+        remaining: float | None = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    @property
+    def cancelled(self) -> bool:
+        """This property tells if the caller has cancelled the job."""
+        return self._cancelled.done()
+
+    def cancel(self) -> None:
+        """Cancel the job and the LLM request in flight.
+
+        It is safe to call from any thread, and more than once.
+        """
+        with self._lock:
+            if not self._cancelled.done():
+                self._cancelled.set_result(None)
+
+    def check(self, stage: str) -> None:
+        """Make sure the given stage is still allowed to start.
+
+        :param stage: The name of the stage, used in error messages.
+        :raise JobCancelledError: The job is cancelled.
+        :raise DeadlineExceededError: The budget is spent.
+        """
+        if self.cancelled:
+            error_msg: str = f"The job is cancelled before {stage}."
+            raise JobCancelledError(error_msg)
+        if self.expired:
+            error_msg: str = f"The deadline is exceeded before {stage}."
+            raise DeadlineExceededError(error_msg)
+
+    def request(
+        self,
+        stage: str,
+        func: Callable[[ollama.AsyncClient], Awaitable[T]],
+        pool: ClientPool = SHARED_CLIENT_POOL,
+    ) -> T:
+        """Run an LLM request within the remaining budget.
+
+        The request runs on the event loop of the pool, with a client that
+        uses the remaining budget as its HTTP timeout. The caller returns as
+        soon as the request completes, the budget is spent or the job is
+        cancelled. In the last two cases the request task is cancelled, and
+        its client is closed with the connection it uses.
+
+        :param stage: The name of the stage, used in error messages.
+        :param func: The request to run with the given client.
+        :param pool: The pool to take the client from. Defaults to the shared pool.
+        :raise JobCancelledError: The job is cancelled.
+        :raise DeadlineExceededError: The budget is spent.
+        :return: The result of the request.
+        """
+        self.check(stage)
+        result: Future[T] = pool.submit(func, self.remaining())
+        wait([result, self._cancelled], timeout=self.remaining(), return_when=FIRST_COMPLETED)
+
+        # The request may complete while it is being cancelled.
+        if not result.done() and result.cancel():
+            if self.cancelled:
+                error_msg: str = f"The job is cancelled during {stage}."
+                raise JobCancelledError(error_msg)
+            error_msg: str = f"The deadline is exceeded during {stage}."
+            raise DeadlineExceededError(error_msg)
+
+        try:
+            return result.result()
+        except httpx.TimeoutException as err:
+            error_msg: str = f"The deadline is exceeded during {stage}."
+            raise DeadlineExceededError(error_msg) from err
@@ -6,15 +6,24 @@ receipts and providing structured datatype to the consumers.
 """
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 from typing import Any
 
-import ollama
 from pydantic import BaseModel
 
 from backend.ai.assistants.base import AssistantBase
 from backend.ai.assistants.base import AssistantSettings
+from backend.ai.assistants.base import AssistantUnavailableError
 from backend.ai.assistants.base import ModelAccessType
+from backend.ai.assistants.clients import SHARED_CLIENT_POOL
+from backend.ai.assistants.clients import ClientPool
+from backend.ai.assistants.deadline import Deadline
 from backend.ai.datatypes import OcrResponse
+from backend.ai.images import ALLOWED_IMAGE_FORMATS
+from backend.ai.images import read_image_format
+
+if TYPE_CHECKING:
+    import ollama
 
 OCR_DEFAULT_SETTINGS: AssistantSettings = AssistantSettings(
     model="llama3.2-vision:11b",
@@ -32,22 +41,31 @@ class OcrAssistant(AssistantBase):
     indicating the OCR has failed.
     """
 
-    def __init__(self, settings: AssistantSettings = OCR_DEFAULT_SETTINGS) -> None:
+    def __init__(
+        self,
+        settings: AssistantSettings = OCR_DEFAULT_SETTINGS,
+        clients: ClientPool = SHARED_CLIENT_POOL,
+    ) -> None:
         """Construct for the OcrAssistant.
 
         :param settings: AssistantSettings instance with OCR model settings.
+        :param clients: The pool of LLM clients. Defaults to the shared pool.
         """
-        super().__init__(settings)
+        super().__init__(settings, clients)
 
-    def ask(self, input_data: dict[str, Any]) -> BaseModel:
+    def ask(self, input_data: dict[str, Any], deadline: Deadline | None = None) -> BaseModel:
         """Send the receipt image to LLM agent, and ask for OCR.
 
         :param input_data: A dict contains "image" key with a value
         that holds absolute path of an image.
+        :param deadline: The job deadline bounding the requests. Defaults to no limit.
         :raise NotImplementedError: OcrAssistant with different access type.
-        :raise RuntimeError: The model is not accessible.
+        :raise AssistantUnavailableError: The model is not accessible.
+        :raise JobCancelledError: The job is cancelled by the caller.
+        :raise DeadlineExceededError: The job deadline is exceeded.
         :raise ValueError: The input data is not in proper format.
         :raise FileNotFoundError: The image file cannot be found.
+        :raise TypeError: The image is not in a supported format.
         :returns: A OcrResponse element.
         """
         # Check if access type is OLLAMA.
@@ -55,40 +73,44 @@ class OcrAssistant(AssistantBase):
             error_msg: str = "The OcrAssistant is only support OLLAMA accesses."
             raise NotImplementedError(error_msg)
 
-        # Check if model is accessible.
-        if not self.heartbeat():
+        # Check if model is accessible within the job deadline.
+        deadline = deadline or Deadline()
+        if not self.heartbeat(deadline):
             error_msg: str = f"The {self._settings.access.name} is not accessible."
-            raise RuntimeError(error_msg)
+            raise AssistantUnavailableError(error_msg)
 
         # Check the input_data format.
         if "image" not in input_data:
             error_msg: str = "The input_data should have image key."
             raise ValueError(error_msg)
 
-        # Check the image type.
-        allowed_formats: list[str] = ["jpeg", "jpg", "png"]
-        if input_data["image"].split(".")[-1] not in allowed_formats:
-            error_msg: str = f"The image should be in formats: {allowed_formats}."
-            raise TypeError(error_msg)
-
         # Check if the file exists.
         receipt_image: Path = Path(input_data["image"])
         if not receipt_image.exists():
             error_msg: str = "The image path in the input_data cannot be found in the filesystem."
             raise FileNotFoundError(error_msg)
 
+        # Check the image type from its signature.
+        if read_image_format(receipt_image) not in ALLOWED_IMAGE_FORMATS:
+            error_msg: str = f"The image should be in formats: {list(ALLOWED_IMAGE_FORMATS)}."
+            raise TypeError(error_msg)
+
         # Send the OCR request to agent.
-        response: ollama.ChatResponse = ollama.chat(
-            model=self._settings.model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": self._settings.prompt,
-                    "images": [input_data["image"]],
-                    "options": {"temperature": 0},
-                },
-            ],
-            format=self._settings.response_model_json,
+        response: ollama.ChatResponse = deadline.request(
+            self.__class__.__name__,
+            lambda client: client.chat(
+                model=self._settings.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": self._settings.prompt,
+                        "images": [input_data["image"]],
+                        "options": {"temperature": 0},
+                    },
+                ],
+                format=self._settings.response_model_json,
+            ),
+            self._clients,
         )
 
         # Check if content is received.
@@ -0,0 +1,38 @@
+"""
+This module provides the compiled prompt templates of the assistants.
+
+A prompt file is split once into its literal parts and placeholders,
+so rendering a prompt is a single join instead of a full scan of the
+template for every placeholder.
+"""
+
+import re
+
+PLACEHOLDER_PATTERN: re.Pattern = re.compile(r"(\{% [A-Z_]+ %\})")
+
+
+class PromptTemplate:
+    """A prompt text compiled into literal parts and placeholders."""
+
+    def __init__(self, text: str) -> None:
+        """Compile the given prompt text.
+
+        :param text: The prompt text with "{% NAME %}" placeholders.
+        """
+        self.text: str = text
+        # Even indices are literals, odd indices are placeholders.
+        self._parts: tuple[str, ...] = tuple(PLACEHOLDER_PATTERN.split(text))
+        self.placeholders: frozenset[str] = frozenset(self._parts[1::2])
+
+    def render(self, values: dict[str, str]) -> str:
+        """Substitute the placeholders with the given values.
+
+        Placeholders without a value are kept as they are in the prompt.
+
+        :param values: A dict that maps placeholders to their values.
+        :return: The rendered prompt.
+        """
+        parts: list[str] = list(self._parts)
+        for index in range(1, len(parts), 2):
+            parts[index] = values.get(parts[index], parts[index])
+        return "".join(parts)
@@ -0,0 +1,73 @@
+"""
+This module provides the process-wide registry of assistants.
+
+The assistants keep no state between requests, so a single instance of
+each assistant is built per process and shared by every job. The
+instances share one client pool, and the compiled prompts and schemas
+of their settings.
+"""
+
+import threading
+from functools import cache
+from typing import TypeVar
+
+from backend.ai.assistants.analyzer import AnalyzerAssistant
+from backend.ai.assistants.base import AssistantBase
+from backend.ai.assistants.clients import SHARED_CLIENT_POOL
+from backend.ai.assistants.clients import ClientPool
+from backend.ai.assistants.ocr import OcrAssistant
+from backend.ai.assistants.translator import TranslatorAssistant
+
+A = TypeVar("A", bound=AssistantBase)
+
+
+class AssistantRegistry:
+    """A thread-safe registry that builds each assistant once."""
+
+    def __init__(self, clients: ClientPool = SHARED_CLIENT_POOL) -> None:
+        """Construct an empty registry.
+
+        :param clients: The pool of LLM clients given to the assistants.
+        """
+        self._clients: ClientPool = clients
+        self._assistants: dict[type[AssistantBase], AssistantBase] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, assistant_type: type[A]) -> A:
+        """Return the assistant of the given type, building it on first use.
+
+        :param assistant_type: An AssistantBase subclass with default settings.
+        :return: The shared assistant instance.
+        """
+        assistant: AssistantBase | None = self._assistants.get(assistant_type)
+        if assistant is None:
+            with self._lock:
+                assistant = self._assistants.get(assistant_type)
+                if assistant is None:
+                    assistant = assistant_type(clients=self._clients)
+                    self._assistants[assistant_type] = assistant
+        return assistant
+
+    @property
+    def ocr(self) -> OcrAssistant:
+        """This property returns the shared OcrAssistant."""
+        return self.get(OcrAssistant)
+
+    @property
+    def analyzer(self) -> AnalyzerAssistant:
+        """This property returns the shared AnalyzerAssistant."""
+        return self.get(AnalyzerAssistant)
+
+    @property
+    def translator(self) -> TranslatorAssistant:
+        """This property returns the shared TranslatorAssistant."""
+        return self.get(TranslatorAssistant)
+
+
+@cache
+def get_registry() -> AssistantRegistry:
+    """Return the registry of the current process.
+
+    :return: The process-wide AssistantRegistry.
+    """
+    return AssistantRegistry()
@@ -5,16 +5,23 @@ This module contains the implementation related to LLM-TRANSLATE for reading
 the product names and translates them into a known language.
 """
 
+from typing import TYPE_CHECKING
 from typing import Any
 
-import ollama
 from pydantic import BaseModel
 
 from backend.ai.assistants.base import AssistantBase
 from backend.ai.assistants.base import AssistantSettings
+from backend.ai.assistants.base import AssistantUnavailableError
 from backend.ai.assistants.base import ModelAccessType
+from backend.ai.assistants.clients import SHARED_CLIENT_POOL
+from backend.ai.assistants.clients import ClientPool
+from backend.ai.assistants.deadline import Deadline
 from backend.ai.datatypes import OcrResponse
 
+if TYPE_CHECKING:
+    import ollama
+
 TRANSLATOR_DEFAULT_SETTINGS: AssistantSettings = AssistantSettings(
     model="llama3.2-vision:11b",
     prompt_file="backend/ai/prompts/ocr.txt",
@@ -29,19 +36,27 @@ class TranslatorAssistant(AssistantBase):
     SOURCE_LANG_PLACEHOLDER: str = "{% SOURCE_LANG %}"
     TARGET_LANG_PLACEHOLDER: str = "{% TARGET_LANG %}"
 
-    def __init__(self, settings: AssistantSettings = TRANSLATOR_DEFAULT_SETTINGS) -> None:
+    def __init__(
+        self,
+        settings: AssistantSettings = TRANSLATOR_DEFAULT_SETTINGS,
+        clients: ClientPool = SHARED_CLIENT_POOL,
+    ) -> None:
         """Construct for the TranslatorAssistant.
 
         :param settings: AssistantSettings instance with OCR model settings.
+        :param clients: The pool of LLM clients. Defaults to the shared pool.
         """
-        super().__init__(settings)
+        super().__init__(settings, clients)
 
-    def ask(self, input_data: dict[str, Any]) -> BaseModel:
+    def ask(self, input_data: dict[str, Any], deadline: Deadline | None = None) -> BaseModel:
         """Send the receipt data to LLM agent, and ask for translation.
 
         :param input_data: A dict contains "previous", "source_lang", "target_lang" keys
+        :param deadline: The job deadline bounding the requests. Defaults to no limit.
         :raise NotImplementedError: Assistant with different access type.
-        :raise RuntimeError: The model is not accessible.
+        :raise AssistantUnavailableError: The model is not accessible.
+        :raise JobCancelledError: The job is cancelled by the caller.
+        :raise DeadlineExceededError: The job deadline is exceeded.
         :raise ValueError: The input data is not in proper format.
         :returns: A OcrResponse element.
         """
@@ -50,10 +65,11 @@ class TranslatorAssistant(AssistantBase):
             error_msg: str = "The OcrAssistant is only support OLLAMA accesses."
             raise NotImplementedError(error_msg)
 
-        # Check if model is accessible.
-        if not self.heartbeat():
+        # Check if model is accessible within the job deadline.
+        deadline = deadline or Deadline()
+        if not self.heartbeat(deadline):
             error_msg: str = f"The {self._settings.access.name} is not accessible."
-            raise RuntimeError(error_msg)
+            raise AssistantUnavailableError(error_msg)
 
         # Check the input_data format.
         if "source_lang" not in input_data or "target_lang" not in input_data or "previous" not in input_data:
@@ -67,23 +83,29 @@ class TranslatorAssistant(AssistantBase):
             raise ValueError(error_msg)
 
         # Convert BaseModel to string to provide with prompt.
-        content: str = (
-            self._settings.prompt.replace(self.SOURCE_LANG_PLACEHOLDER, input_data["source_lang"])
-            .replace(self.TARGET_LANG_PLACEHOLDER, input_data["target_lang"])
-            .replace(self.SERIALIZED_OBJECT_PLACEHOLDER, previous.model_dump_json())
+        content: str = self._settings.template.render(
+            {
+                self.SOURCE_LANG_PLACEHOLDER: input_data["source_lang"],
+                self.TARGET_LANG_PLACEHOLDER: input_data["target_lang"],
+                self.SERIALIZED_OBJECT_PLACEHOLDER: previous.model_dump_json(),
+            },
         )
 
         # Send the OCR request to agent.
-        response: ollama.ChatResponse = ollama.chat(
-            model=self._settings.model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": content,
-                    "options": {"temperature": 0},
-                },
-            ],
-            format=self._settings.response_model_json,
+        response: ollama.ChatResponse = deadline.request(
+            self.__class__.__name__,
+            lambda client: client.chat(
+                model=self._settings.model,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": content,
+                        "options": {"temperature": 0},
+                    },
+                ],
+                format=self._settings.response_model_json,
+            ),
+            self._clients,
         )
 
         # Check if content is received.
@@ -0,0 +1,196 @@
+"""
+This module scores the self-consistency of an OCR result.
+
+The checks are cheap and run without any LLM: the product prices minus
+their discounts should sum to the total price, the currencies should
+agree, the date should be plausible, and the product names should be
+dictionary words. A stage gate uses the scores to skip the analyzer when
+the names are already spelled out, and the translator when the names are
+already in the target language.
+"""
+
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from backend.ai.datatypes import OcrResponse
+
+WORD_PATTERN: re.Pattern = re.compile(r"[^\W\d_]+")
+EARLIEST_RECEIPT_YEAR: int = 2000
+
+
+def load_wordlist(path: Path) -> frozenset[str]:
+    """Load a dictionary file with one word per line.
+
+    :param path: The path to the word list.
+    :raise ValueError: The word list cannot be found.
+    :return: The lower-cased words.
+    """
+    try:
+        with Path.open(path, "r", encoding="utf-8") as f:
+            return frozenset(line.strip().lower() for line in f if line.strip())
+    except FileNotFoundError as err:
+        error_msg: str = f"Word list {path} is not found."
+        raise ValueError(error_msg) from err
+
+
+class ConsistencyReport(BaseModel):
+    """This class holds the scores of each check, between 0 and 1."""
+
+    prices: float
+    currencies: float
+    date_time: float
+    names_spelled: float
+    names_in_target: float
+
+    @property
+    def structure(self) -> float:
+        """This property returns the mean score of the receipt structure checks."""
+        return (self.prices + self.currencies + self.date_time) / 3
+
+    @property
+    def analyzer_confidence(self) -> float:
+        """This property returns the confidence that the analyzer has nothing to fix."""
+        return self.structure * self.names_spelled
+
+    @property
+    def translator_confidence(self) -> float:
+        """This property returns the confidence that the translator has nothing to translate."""
+        return self.structure * self.names_in_target
+
+
+class ConsistencyScorer:
+    """This class scores an OCR result against the receipt consistency checks."""
+
+    def __init__(
+        self,
+        source_words: frozenset[str] = frozenset(),
+        target_words: frozenset[str] = frozenset(),
+        price_tolerance: float = 0.01,
+    ) -> None:
+        """Construct the scorer with the dictionaries of both languages.
+
+        A name can only be confirmed by a dictionary, so the name checks
+        score zero when the dictionaries are empty.
+
+        :param source_words: The lower-cased words of the receipt language.
+        :param target_words: The lower-cased words of the target language.
+        :param price_tolerance: The allowed difference of the sum to the total price.
+        """
+        self._spelled_words: frozenset[str] = source_words | target_words
+        self._target_words: frozenset[str] = target_words
+        self._price_tolerance: float = price_tolerance
+
+    def score(self, ocr_result: OcrResponse) -> ConsistencyReport:
+        """Run every check on the OCR result.
+
+        :param ocr_result: The OCR result to score.
+        :return: The scores of the checks.
+        """
+        return ConsistencyReport(
+            prices=self._score_prices(ocr_result),
+            currencies=self._score_currencies(ocr_result),
+            date_time=self._score_date_time(ocr_result),
+            names_spelled=self._score_names(ocr_result, self._spelled_words),
+            names_in_target=self._score_names(ocr_result, self._target_words),
+        )
+
+    def _score_prices(self, ocr_result: OcrResponse) -> float:
+        """Check that the prices minus the discounts sum to the total price."""
+        if not ocr_result.products or ocr_result.total_price is None:
+            return 0.0
+        subtotal: float = sum(product.price - abs(product.discount or 0.0) for product in ocr_result.products)
+        return 1.0 if abs(subtotal - ocr_result.total_price) <= self._price_tolerance else 0.0
+
+    def _score_currencies(self, ocr_result: OcrResponse) -> float:
+        """Check that every price is in the currency of the total price."""
+        if not ocr_result.products:
+            return 0.0
+        currencies: set = {product.price_currency for product in ocr_result.products}
+        if ocr_result.total_price_currency is not None:
+            currencies.add(ocr_result.total_price_currency)
+        return 1.0 if len(currencies) == 1 else 0.0
+
+    def _score_date_time(self, ocr_result: OcrResponse) -> float:
+        """Check that the date is parsed, and is not in the future."""
+        date_time: datetime | None = ocr_result.date_time
+        if date_time is None or date_time.year < EARLIEST_RECEIPT_YEAR:
+            return 0.0
+        now: datetime = datetime.now(tz=date_time.tzinfo)
+        return 1.0 if date_time <= now else 0.0
+
+    def _score_names(self, ocr_result: OcrResponse, words: frozenset[str]) -> float:
+        """Return the share of the name words that are found in the dictionary."""
+        tokens: list[str] = [
+            token for product in ocr_result.products or [] for token in WORD_PATTERN.findall(product.name.lower())
+        ]
+        if not tokens or not words:
+            return 0.0
+        return sum(token in words for token in tokens) / len(tokens)
+
+
+class GateDecision(BaseModel):
+    """This class holds the stages skipped for a single OCR result."""
+
+    report: ConsistencyReport
+    skip_analyzer: bool
+    skip_translator: bool
+
+
+class StageGate:
+    """This class decides which stages to skip, and counts the decisions."""
+
+    def __init__(
+        self,
+        scorer: ConsistencyScorer,
+        analyzer_threshold: float | None = 0.9,
+        translator_threshold: float | None = 0.9,
+    ) -> None:
+        """Construct the gate with a threshold per stage.
+
+        :param scorer: The consistency scorer.
+        :param analyzer_threshold: The confidence to skip the analyzer. None never skips.
+        :param translator_threshold: The confidence to skip the translator. None never skips.
+        """
+        self._scorer: ConsistencyScorer = scorer
+        self._analyzer_threshold: float | None = analyzer_threshold
+        self._translator_threshold: float | None = translator_threshold
+        self._lock: threading.Lock = threading.Lock()
+        self._counts: dict[str, int] = {"analyzer": 0, "analyzer_skipped": 0, "translator": 0, "translator_skipped": 0}
+
+    def decide(self, ocr_result: OcrResponse) -> GateDecision:
+        """Score an OCR result, and decide which stages it can skip.
+
+        :param ocr_result: The OCR result to score.
+        :return: The decision with its scores.
+        """
+        report: ConsistencyReport = self._scorer.score(ocr_result)
+        return GateDecision(
+            report=report,
+            skip_analyzer=self._analyzer_threshold is not None
+            and report.analyzer_confidence >= self._analyzer_threshold,
+            skip_translator=self._translator_threshold is not None
+            and report.translator_confidence >= self._translator_threshold,
+        )
+
+    def count(self, stage: str, *, skipped: bool) -> None:
+        """Count a decision taken for a stage.
+
+        :param stage: Either "analyzer" or "translator".
+        :param skipped: True if the stage is skipped.
+        """
+        with self._lock:
+            self._counts[stage] += 1
+            self._counts[f"{stage}_skipped"] += skipped
+
+    @property
+    def skip_rates(self) -> dict[str, float]:
+        """This property returns the share of skipped runs per stage."""
+        with self._lock:
+            return {
+                stage: self._counts[f"{stage}_skipped"] / self._counts[stage] if self._counts[stage] else 0.0
+                for stage in ("analyzer", "translator")
+            }
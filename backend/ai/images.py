@@ -0,0 +1,112 @@
+"""
+This module inspects the receipt images before they reach the assistants.
+
+The image format is detected from the file signature instead of the
+file extension, and the image headers are decoded to make sure that
+the file is complete. A file that is still being written has no end
+marker, and is reported as truncated. Data after the end marker, such
+as the trailers that phone cameras append, is allowed.
+"""
+
+import struct
+from pathlib import Path
+
+IMAGE_SIGNATURES: dict[bytes, str] = {
+    b"\xff\xd8\xff": "jpeg",
+    b"\x89PNG\r\n\x1a\n": "png",
+}
+ALLOWED_IMAGE_FORMATS: tuple[str, ...] = tuple(IMAGE_SIGNATURES.values())
+SIGNATURE_LENGTH: int = max(len(signature) for signature in IMAGE_SIGNATURES)
+
+# JPEG start of frame markers, excluding DHT, JPG and DAC.
+JPEG_SOF_MARKERS: frozenset[int] = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS: frozenset[int] = frozenset(range(0xD0, 0xDA)) | {0x01}
+JPEG_SOS: int = 0xDA
+JPEG_EOI: bytes = b"\xff\xd9"
+PNG_IEND: bytes = b"IEND\xaeB`\x82"
+
+
+def detect_image_format(header: bytes) -> str | None:
+    """Detect the image format from the first bytes of a file.
+
+    :param header: The first bytes of the file.
+    :return: The format name, or None if the format is not supported.
+    """
+    for signature, image_format in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return image_format
+    return None
+
+
+def read_image_format(image_path: Path) -> str | None:
+    """Detect the image format of the given file.
+
+    :param image_path: The path to the image.
+    :raise FileNotFoundError: The image cannot be found.
+    :return: The format name, or None if the format is not supported.
+    """
+    with Path.open(image_path, "rb") as f:
+        return detect_image_format(f.read(SIGNATURE_LENGTH))
+
+
+def decode_image_size(data: bytes) -> tuple[int, int]:
+    """Decode the headers of an image, and return its size.
+
+    :param data: The whole image file.
+    :raise ValueError: The image is not supported, corrupt or truncated.
+    :return: The width and height of the image.
+    """
+    image_format: str | None = detect_image_format(data)
+    if image_format == "png":
+        return _decode_png_size(data)
+    if image_format == "jpeg":
+        return _decode_jpeg_size(data)
+    error_msg: str = f"The image should be in formats: {list(ALLOWED_IMAGE_FORMATS)}."
+    raise ValueError(error_msg)
+
+
+def _decode_png_size(data: bytes) -> tuple[int, int]:
+    """Decode the IHDR chunk of a PNG image."""
+    if len(data) < 24 or data[12:16] != b"IHDR":  # noqa: PLR2004
+        error_msg: str = "The PNG image has no IHDR chunk."
+        raise ValueError(error_msg)
+    if data.find(PNG_IEND, 24) < 0:
+        error_msg: str = "The PNG image is truncated."
+        raise ValueError(error_msg)
+    width, height = struct.unpack(">II", data[16:24])
+    return width, height
+
+
+def _decode_jpeg_size(data: bytes) -> tuple[int, int]:
+    """Walk the JPEG segments until the start of scan, and find its end marker."""
+    size: tuple[int, int] | None = None
+    offset: int = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:  # noqa: PLR2004
+            error_msg: str = "The JPEG image has a corrupt segment."
+            raise ValueError(error_msg)
+        marker: int = data[offset + 1]
+        if marker == 0xFF:  # noqa: PLR2004
+            offset += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        (length,) = struct.unpack(">H", data[offset + 2 : offset + 4])
+        if marker in JPEG_SOF_MARKERS and offset + 9 <= len(data):
+            height, width = struct.unpack(">HH", data[offset + 5 : offset + 9])
+            size = (width, height)
+        if marker == JPEG_SOS:
+            if size is None:
+                error_msg: str = "The JPEG image has no start of frame."
+                raise ValueError(error_msg)
+            # The entropy-coded data cannot contain the end marker, so the
+            # first one after the scan header ends the image.
+            if data.find(JPEG_EOI, offset + 2 + length) < 0:
+                error_msg: str = "The JPEG image is truncated."
+                raise ValueError(error_msg)
+            return size
+        offset += 2 + length
+
+    error_msg: str = "The JPEG image is truncated."
+    raise ValueError(error_msg)
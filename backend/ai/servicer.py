@@ -4,11 +4,27 @@ This servicer module runs the LLM chain.
 The chain is constructed to perform OCR first, run the
 analyzer the second to fix problems found on OCR, and
 translate the products into the given language.
+
+Every stage of the chain shares one job deadline. A stage gets the
+remaining budget as its HTTP timeout, and the later stages are skipped
+once the budget is spent or the caller cancels the job.
+
+A stage gate may skip the analyzer and the translator when the OCR
+result is consistent on its own, and its names need no correction.
+
+The result of each stage is kept, so that the accuracy of each stage
+can be measured. A skipped stage passes on the result before it.
 """
 
+from pydantic import BaseModel
+
 from backend.ai.assistants import AnalyzerAssistant
+from backend.ai.assistants import Deadline
 from backend.ai.assistants import OcrAssistant
 from backend.ai.assistants import TranslatorAssistant
+from backend.ai.assistants import get_registry
+from backend.ai.consistency import GateDecision
+from backend.ai.consistency import StageGate
 from backend.ai.datatypes import OcrResponse
 from backend.ai.datatypes import OcrStatus
 from datatypes import OcrStatusTypes
@@ -19,55 +35,114 @@ class PipelineError(BaseException):
     """This class represents errors in the pipeline."""
 
 
-def run_pipeline(image_path: str) -> Receipt:
-    """Run the assistants in a spesific order.
+class PipelineStages(BaseModel):
+    """This class holds the result of each stage of the chain."""
+
+    ocr: OcrResponse
+    analyzer: OcrResponse
+    translator: OcrResponse
+
+
+def run_pipeline(
+    image_path: str,
+    timeout: float | None = None,
+    deadline: Deadline | None = None,
+    gate: StageGate | None = None,
+) -> Receipt:
+    """Run the assistants in a spesific order, and build the receipt.
 
     :param image_path: The path to the receipt image.
+    :param timeout: The budget of the whole job in seconds. Ignored if deadline is given.
+    :param deadline: The job deadline shared by the assistants. Defaults to a new one from timeout.
+    :param gate: The gate that decides which stages to skip. Defaults to running every stage.
     :raise PipelineError: AI assistants cannot process information.
+    :raise JobCancelledError: The caller has cancelled the job.
+    :raise DeadlineExceededError: The job could not complete within its budget.
     :return: The receipt instance.
     """
-    ocr_agent: OcrAssistant = OcrAssistant()
-    analyzer_agent: AnalyzerAssistant = AnalyzerAssistant()
-    translator_agent: TranslatorAssistant = TranslatorAssistant()
+    stages: PipelineStages = run_stages(image_path, timeout, deadline, gate)
+    translated_ocr: OcrResponse = stages.translator
+    return Receipt(
+        receipt_id="receipt-12341234-1234-1234-12341234",
+        ocr_status=OcrStatusTypes.SUCCESS if translated_ocr.ocr_status == OcrStatus.SUCCESS else OcrStatusTypes.ERROR,
+        store_name=translated_ocr.store_name,
+        store_address=translated_ocr.store_address,
+        date_time=translated_ocr.date_time,
+        category=[product.category for product in translated_ocr.products],
+        products=stages.analyzer.products,
+    )
+
+
+def run_stages(
+    image_path: str,
+    timeout: float | None = None,
+    deadline: Deadline | None = None,
+    gate: StageGate | None = None,
+) -> PipelineStages:
+    """Run the assistants in a spesific order, and return the result of each.
+
+    A caller that wants to cancel the job from another thread should
+    create the deadline itself, and call its cancel method.
+
+    :param image_path: The path to the receipt image.
+    :param timeout: The budget of the whole job in seconds. Ignored if deadline is given.
+    :param deadline: The job deadline shared by the assistants. Defaults to a new one from timeout.
+    :param gate: The gate that decides which stages to skip. Defaults to running every stage.
+    :raise PipelineError: AI assistants cannot process information.
+    :raise JobCancelledError: The caller has cancelled the job.
+    :raise DeadlineExceededError: The job could not complete within its budget.
+    :return: The result of each stage.
+    """
+    deadline = deadline or Deadline(timeout)
+    ocr_agent: OcrAssistant = get_registry().ocr
+    analyzer_agent: AnalyzerAssistant = get_registry().analyzer
+    translator_agent: TranslatorAssistant = get_registry().translator
 
-    ocr_result: OcrResponse = ocr_agent.ask({"image": image_path})
+    ocr_result: OcrResponse = ocr_agent.ask({"image": image_path}, deadline)
     print(f"ocr_result: {ocr_result}")
     if ocr_result.ocr_status != OcrStatus.SUCCESS:
         error_msg: str = "The OCR assistant has failed. Please re-run."
         raise PipelineError(error_msg)
 
-    corrected_ocr: OcrResponse = analyzer_agent.ask({"ocr_result": ocr_result})
-    print(f"corrected_ocr: {corrected_ocr}")
-    if corrected_ocr.ocr_status != OcrStatus.SUCCESS:
-        error_msg: str = "The Analyzer assistant has failed. Please re-run."
-        raise PipelineError(error_msg)
+    decision: GateDecision | None = gate.decide(ocr_result) if gate else None
+    if gate:
+        gate.count("analyzer", skipped=decision.skip_analyzer)
 
-    if len(corrected_ocr.products) != len(ocr_result.products):
-        error_msg: str = "The Analyzer assistant did not return the same amount of products. Please re-run."
-        raise PipelineError(error_msg)
+    corrected_ocr: OcrResponse = ocr_result
+    if not (decision and decision.skip_analyzer):
+        corrected_ocr = analyzer_agent.ask({"ocr_result": ocr_result}, deadline)
+        print(f"corrected_ocr: {corrected_ocr}")
+        if corrected_ocr.ocr_status != OcrStatus.SUCCESS:
+            error_msg: str = "The Analyzer assistant has failed. Please re-run."
+            raise PipelineError(error_msg)
 
-    translated_ocr: OcrResponse = translator_agent.ask(
-        {
-            "previous": corrected_ocr,
-            "source_lang": "German",
-            "target_lang": "English",
-        },
-    )
-    print(f"translated_ocr: {translated_ocr}")
-    if translated_ocr.ocr_status != OcrStatus.SUCCESS:
-        error_msg: str = "The Translator assistant has failed. Please re-run."
-        raise PipelineError(error_msg)
+        if len(corrected_ocr.products) != len(ocr_result.products):
+            error_msg: str = "The Analyzer assistant did not return the same amount of products. Please re-run."
+            raise PipelineError(error_msg)
 
-    if len(translated_ocr.products) != len(corrected_ocr.products):
-        error_msg: str = "The Translator assistant did not return the same amount of products. Please re-run."
-        raise PipelineError(error_msg)
+        # The names have changed, so the translator is decided again.
+        decision = gate.decide(corrected_ocr) if gate else None
 
-    return Receipt(
-        receipt_id="receipt-12341234-1234-1234-12341234",
-        ocr_status=OcrStatusTypes.SUCCESS if translated_ocr.ocr_status == OcrStatus.SUCCESS else OcrStatusTypes.ERROR,
-        store_name=translated_ocr.store_name,
-        store_address=translated_ocr.store_address,
-        date_time=translated_ocr.date_time,
-        category=[product.category for product in translated_ocr.products],
-        products=corrected_ocr.products,
-    )
+    if gate:
+        gate.count("translator", skipped=decision.skip_translator)
+
+    translated_ocr: OcrResponse = corrected_ocr
+    if not (decision and decision.skip_translator):
+        translated_ocr = translator_agent.ask(
+            {
+                "previous": corrected_ocr,
+                "source_lang": "German",
+                "target_lang": "English",
+            },
+            deadline,
+        )
+        print(f"translated_ocr: {translated_ocr}")
+        if translated_ocr.ocr_status != OcrStatus.SUCCESS:
+            error_msg: str = "The Translator assistant has failed. Please re-run."
+            raise PipelineError(error_msg)
+
+        if len(translated_ocr.products) != len(corrected_ocr.products):
+            error_msg: str = "The Translator assistant did not return the same amount of products. Please re-run."
+            raise PipelineError(error_msg)
+
+    return PipelineStages(ocr=ocr_result, analyzer=corrected_ocr, translator=translated_ocr)
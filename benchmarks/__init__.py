@@ -0,0 +1 @@
+"""This package provides benchmarks that measure the overhead of our own code."""
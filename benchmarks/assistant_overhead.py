@@ -0,0 +1,140 @@
+"""
+This benchmark measures the per-call overhead of the assistants.
+
+The LLM server is replaced with an offline client that returns a fixed
+response, so the timings only contain the work done in our own code:
+building the assistants, loading and rendering the prompts, running the
+request on the event loop of the client pool and validating the response.
+
+Run from the repository root with: python -m benchmarks.assistant_overhead
+"""
+
+import timeit
+from pathlib import Path
+from typing import Any
+
+import ollama
+
+from backend.ai.assistants import AnalyzerAssistant
+from backend.ai.assistants import AssistantRegistry
+from backend.ai.assistants import ClientPool
+from backend.ai.assistants import Deadline
+from backend.ai.assistants import TranslatorAssistant
+from backend.ai.datatypes import OcrResponse
+from backend.ai.datatypes import OcrStatus
+from datatypes import Currencies
+from datatypes import Product
+from datatypes import ProductCategories
+
+ROUNDS: int = 2000
+
+SAMPLE_OCR: OcrResponse = OcrResponse(
+    ocr_status=OcrStatus.SUCCESS,
+    store_name="REWE Markt GmbH",
+    store_address="Domstr. 20, 50668 Koeln",
+    date_time="2024-12-14T10:42:00",
+    products=[
+        Product(
+            name=f"BIO VOLLM. {index}",
+            category=ProductCategories.FOOD,
+            price=1.29 + index,
+            price_currency=Currencies.EUR,
+            discount=None,
+        )
+        for index in range(20)
+    ],
+    total_price=215.8,
+    total_price_currency=Currencies.EUR,
+)
+
+
+class OfflineClient:
+    """A stand-in for ollama.AsyncClient that answers without any network."""
+
+    def __init__(self, content: str) -> None:
+        """Construct the client with the fixed response content.
+
+        :param content: The message content of every chat response.
+        """
+        self._content: str = content
+
+    async def list(self) -> ollama.ListResponse:
+        """Answer the heartbeat."""
+        return ollama.ListResponse(models=[])
+
+    async def chat(self, **_: Any) -> ollama.ChatResponse:  # noqa: ANN401
+        """Answer the chat request with the fixed content."""
+        return ollama.ChatResponse(message=ollama.Message(role="assistant", content=self._content))
+
+
+class OfflinePool(ClientPool):
+    """A client pool that hands out a single offline client."""
+
+    def __init__(self, content: str) -> None:
+        """Construct the pool with the fixed response content.
+
+        :param content: The message content of every chat response.
+        """
+        super().__init__()
+        self._client: OfflineClient = OfflineClient(content)
+
+    def acquire(self, timeout: float | None) -> OfflineClient:  # noqa: ARG002
+        """Return the offline client."""
+        return self._client
+
+    async def release(self, client: OfflineClient) -> None:
+        """Keep the offline client."""
+
+    async def discard(self, client: OfflineClient) -> None:
+        """Keep the offline client."""
+
+
+def legacy_render() -> str:
+    """Read and render the analyzer prompt the way it was done per call."""
+    prompt: str = Path("backend/ai/prompts/analyzer.txt").read_text(encoding="utf-8")
+    product_abbrvs: str = "".join([f"- {abbrv.name}\n" for abbrv in SAMPLE_OCR.products])
+    return prompt.replace(AnalyzerAssistant.PRODUCTS_LIST_PLACEHOLDER, product_abbrvs).replace(
+        AnalyzerAssistant.SERIALIZED_OBJECT_PLACEHOLDER,
+        SAMPLE_OCR.model_dump_json(),
+    )
+
+
+def compiled_render(assistant: AnalyzerAssistant) -> str:
+    """Render the analyzer prompt from the compiled template."""
+    product_abbrvs: str = "".join([f"- {abbrv.name}\n" for abbrv in SAMPLE_OCR.products])
+    return assistant._settings.template.render(  # noqa: SLF001
+        {
+            AnalyzerAssistant.PRODUCTS_LIST_PLACEHOLDER: product_abbrvs,
+            AnalyzerAssistant.SERIALIZED_OBJECT_PLACEHOLDER: SAMPLE_OCR.model_dump_json(),
+        },
+    )
+
+
+def report(name: str, seconds: float) -> None:
+    """Print the mean time per call in microseconds."""
+    print(f"{name:<40} {seconds / ROUNDS * 1e6:>10.1f} us/call")  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    registry: AssistantRegistry = AssistantRegistry(OfflinePool(SAMPLE_OCR.model_dump_json()))
+    analyzer: AnalyzerAssistant = registry.analyzer
+    translator: TranslatorAssistant = registry.translator
+    translate_input: dict[str, Any] = {"previous": SAMPLE_OCR, "source_lang": "German", "target_lang": "English"}
+
+    report("prompt: read + str.replace", timeit.timeit(legacy_render, number=ROUNDS))
+    report("prompt: compiled template", timeit.timeit(lambda: compiled_render(analyzer), number=ROUNDS))
+    report("assistants: construct per call", timeit.timeit(AnalyzerAssistant, number=ROUNDS))
+    report("assistants: registry lookup", timeit.timeit(lambda: registry.analyzer, number=ROUNDS))
+    report(
+        "analyzer.ask (offline)",
+        timeit.timeit(lambda: analyzer.ask({"ocr_result": SAMPLE_OCR}, Deadline(60)), number=ROUNDS),
+    )
+    report(
+        "translator.ask (offline)",
+        timeit.timeit(lambda: translator.ask(translate_input, Deadline(60)), number=ROUNDS),
+    )
+
+
+if __name__ == "__main__":
+    main()
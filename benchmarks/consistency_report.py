@@ -0,0 +1,143 @@
+"""
+This report compares the accuracy and the latency of the stage gate.
+
+The pipeline runs over a labeled sample set once without a gate, and
+once per threshold with the gate. For each run, the report prints the
+skip rate of each stage, the latency, and the share of the products
+whose names and prices match the labels. The names are scored after
+each stage, and the prices after the last one. A skipped stage is
+scored on the result it passes on.
+
+The labels file maps the image file names to their expected products,
+with the names in the target language of the translator:
+
+    {"receipt.jpeg": {"products": [{"name": "Whole Milk", "price": 1.29}]}}
+
+Run from the repository root with:
+python -m benchmarks.consistency_report SAMPLES_DIR --labels LABELS.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any
+
+from backend.ai import ConsistencyScorer
+from backend.ai import PipelineStages
+from backend.ai import StageGate
+from backend.ai import load_wordlist
+from backend.ai import run_stages
+from backend.ai.datatypes import OcrResponse
+from backend.ai.servicer import PipelineError
+
+PRICE_TOLERANCE: float = 0.01
+STAGES: tuple[str, ...] = ("ocr", "analyzer", "translator")
+
+
+def score_stage(ocr_result: OcrResponse, label: dict[str, Any]) -> tuple[float, float]:
+    """Compare the products of a stage result with its label.
+
+    :param ocr_result: The result of a pipeline stage.
+    :param label: The expected products of the receipt.
+    :return: The share of the matching names, and of the matching prices.
+    """
+    expected: list[dict[str, Any]] = label["products"]
+    if not expected:
+        return 1.0, 1.0
+    pairs = list(zip(ocr_result.products or [], expected, strict=False))
+    names: int = sum(product.name.strip().lower() == item["name"].strip().lower() for product, item in pairs)
+    prices: int = sum(abs(product.price - item["price"]) <= PRICE_TOLERANCE for product, item in pairs)
+    return names / len(expected), prices / len(expected)
+
+
+def run_samples(
+    samples: list[Path],
+    labels: dict[str, dict[str, Any]],
+    gate: StageGate | None,
+    timeout: float | None,
+) -> dict[str, Any]:
+    """Run the pipeline over the samples, and collect the measurements.
+
+    :param samples: The sample images.
+    :param labels: The labels of the samples by file name.
+    :param gate: The stage gate, or None to run every stage.
+    :param timeout: The budget per sample in seconds.
+    :return: The measurements of the run.
+    """
+    latencies: list[float] = []
+    name_scores: dict[str, list[float]] = {stage: [] for stage in STAGES}
+    price_scores: list[float] = []
+    failures: int = 0
+    for sample in samples:
+        started: float = time.perf_counter()
+        try:
+            stages: PipelineStages = run_stages(str(sample), timeout=timeout, gate=gate)
+        except (PipelineError, Exception):
+            failures += 1
+            for scores in name_scores.values():
+                scores.append(0.0)
+            price_scores.append(0.0)
+        else:
+            for stage, scores in name_scores.items():
+                names, _ = score_stage(getattr(stages, stage), labels[sample.name])
+                scores.append(names)
+            _, prices = score_stage(stages.translator, labels[sample.name])
+            price_scores.append(prices)
+        latencies.append(time.perf_counter() - started)
+
+    skip_rates: dict[str, float] = gate.skip_rates if gate else {"analyzer": 0.0, "translator": 0.0}
+    return {
+        "analyzer_skip": skip_rates["analyzer"],
+        "translator_skip": skip_rates["translator"],
+        "latency_mean": statistics.fmean(latencies),
+        "latency_max": max(latencies),
+        **{f"{stage}_name_accuracy": statistics.fmean(scores) for stage, scores in name_scores.items()},
+        "price_accuracy": statistics.fmean(price_scores),
+        "failures": failures,
+    }
+
+
+def main() -> None:
+    """Parse the arguments, run every configuration, and print the report."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Stage gate accuracy versus latency.")
+    parser.add_argument("samples", type=Path, help="The directory of the labeled sample images.")
+    parser.add_argument("--labels", type=Path, required=True, help="The JSON file of the labels.")
+    parser.add_argument("--source-words", type=Path, help="The word list of the receipt language.")
+    parser.add_argument("--target-words", type=Path, help="The word list of the target language.")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.9, 1.0], help="The gate thresholds.")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per sample.")
+    args: argparse.Namespace = parser.parse_args()
+
+    with Path.open(args.labels, "r", encoding="utf-8") as f:
+        labels: dict[str, dict[str, Any]] = json.load(f)
+    samples: list[Path] = sorted(args.samples / name for name in labels)
+    scorer: ConsistencyScorer = ConsistencyScorer(
+        source_words=load_wordlist(args.source_words) if args.source_words else frozenset(),
+        target_words=load_wordlist(args.target_words) if args.target_words else frozenset(),
+    )
+
+    configurations: list[tuple[str, StageGate | None]] = [("no gate", None)]
+    configurations += [
+        (f"gate >= {threshold}", StageGate(scorer, threshold, threshold)) for threshold in args.thresholds
+    ]
+
+    header: str = (
+        f"{'configuration':<14} {'skip analyzer':>13} {'skip translator':>15} {'mean s':>8} {'max s':>8} "
+        f"{'ocr names':>9} {'analyzed names':>14} {'translated names':>16} {'prices':>6} {'failed':>6}"
+    )
+    print(f"{len(samples)} samples")  # noqa: T201
+    print(header)  # noqa: T201
+    for name, gate in configurations:
+        result: dict[str, Any] = run_samples(samples, labels, gate, args.timeout)
+        print(  # noqa: T201
+            f"{name:<14} {result['analyzer_skip']:>13.0%} {result['translator_skip']:>15.0%} "
+            f"{result['latency_mean']:>8.2f} {result['latency_max']:>8.2f} "
+            f"{result['ocr_name_accuracy']:>9.0%} {result['analyzer_name_accuracy']:>14.0%} "
+            f"{result['translator_name_accuracy']:>16.0%} {result['price_accuracy']:>6.0%} {result['failures']:>6}",
+        )
+
+
+if __name__ == "__main__":
+    main()
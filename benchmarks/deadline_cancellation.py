@@ -0,0 +1,105 @@
+"""
+This check makes sure that a cancelled request is torn down on the wire.
+
+A local HTTP server stands in for the LLM server. It holds every request
+for a few seconds, and records whether the client disconnects first.
+The check cancels one request and lets the deadline of another expire,
+and fails unless the server sees both disconnects, and the caller is
+released long before the server would have answered.
+
+Run from the repository root with: python -m benchmarks.deadline_cancellation
+"""
+
+import contextlib
+import os
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from backend.ai.assistants import ClientPool
+from backend.ai.assistants import Deadline
+from backend.ai.assistants import DeadlineExceededError
+from backend.ai.assistants import JobCancelledError
+
+SERVER_DELAY: float = 5.0
+RELEASE_AFTER: float = 0.5
+SLACK: float = 1.0
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """A handler that answers late, and records the disconnects."""
+
+    disconnects: list[float] = []  # noqa: RUF012
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Hold the request, and answer unless the client has left."""
+        self._hold()
+
+    def do_POST(self) -> None:  # noqa: N802
+        """Read the body, hold the request, and answer unless the client has left."""
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._hold()
+
+    def _hold(self) -> None:
+        """Wait for the server delay while watching the connection."""
+        deadline: float = time.monotonic() + SERVER_DELAY
+        while time.monotonic() < deadline:
+            readable, _, _ = select.select([self.connection], [], [], 0.05)
+            if readable and not self.connection.recv(1, socket.MSG_PEEK):
+                self.disconnects.append(time.monotonic())
+                return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b'{"models": []}')
+
+    def log_message(self, *_: object) -> None:
+        """Keep the output quiet."""
+
+
+def measure(name: str, deadline: Deadline, pool: ClientPool, expected: type[Exception]) -> bool:
+    """Run a request that should be torn down, and report the result.
+
+    :param name: The name of the case.
+    :param deadline: The deadline of the request.
+    :param pool: The pool bound to the slow server.
+    :param expected: The error the caller should get.
+    :return: True if the caller is released early and the server sees the disconnect.
+    """
+    seen: int = len(SlowHandler.disconnects)
+    started: float = time.monotonic()
+    with contextlib.suppress(expected):
+        deadline.request(name, lambda client: client.list(), pool)
+    released: float = time.monotonic() - started
+
+    time.sleep(SLACK)
+    disconnected: bool = len(SlowHandler.disconnects) > seen
+    passed: bool = released < RELEASE_AFTER + SLACK and disconnected
+    print(f"{name:<8} released after {released:.2f} s, server saw disconnect: {disconnected}")  # noqa: T201
+    return passed
+
+
+def main() -> None:
+    """Run the check against a local slow server."""
+    server: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    pool: ClientPool = ClientPool(host=f"http://127.0.0.1:{server.server_port}")
+
+    cancelled: Deadline = Deadline()
+    threading.Timer(RELEASE_AFTER, cancelled.cancel).start()
+    results: list[bool] = [
+        measure("cancel", cancelled, pool, JobCancelledError),
+        measure("expiry", Deadline(RELEASE_AFTER), pool, DeadlineExceededError),
+    ]
+    server.shutdown()
+    if not all(results):
+        print("FAILED")  # noqa: T201
+        os._exit(1)
+    print("OK")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Ingestion Package to Process Receipt Scans from Shared Folders
+
+The ingestion package provides a daemon that watches directories for
+receipt scans, prepares them in a process pool, and runs the AI
+pipeline over the scans that are ready.
+"""
+
+from services.ingest.daemon import IngestDaemon
+from services.ingest.preparation import PreparedJob
+from services.ingest.progress import JobStatus
+from services.ingest.progress import ProgressLedger
+
+__all__ = [
+    "IngestDaemon",
+    "JobStatus",
+    "PreparedJob",
+    "ProgressLedger",
+]
@@ -0,0 +1,96 @@
+"""
+The command line entry point of the ingestion daemon.
+
+Run from the repository root with: python -m services.ingest DIRECTORY [DIRECTORY ...]
+"""
+
+import argparse
+import logging
+import signal
+from pathlib import Path
+from types import FrameType
+
+from backend.ai import ConsistencyScorer
+from backend.ai import StageGate
+from backend.ai import load_wordlist
+from services.ingest.daemon import IngestDaemon
+
+DEFAULT_THRESHOLD: float = 0.9
+
+
+def build_gate(args: argparse.Namespace, parser: argparse.ArgumentParser) -> StageGate | None:
+    """Build the stage gate from the word lists and the thresholds.
+
+    :param args: The parsed arguments.
+    :param parser: The parser to report the invalid arguments.
+    :return: The stage gate, or None to run every stage.
+    """
+    if not args.source_words and not args.target_words:
+        if args.analyzer_threshold is not None or args.translator_threshold is not None:
+            parser.error("The thresholds need --source-words or --target-words to confirm the product names.")
+        return None
+
+    scorer: ConsistencyScorer = ConsistencyScorer(
+        source_words=load_wordlist(args.source_words) if args.source_words else frozenset(),
+        target_words=load_wordlist(args.target_words) if args.target_words else frozenset(),
+    )
+    return StageGate(
+        scorer,
+        DEFAULT_THRESHOLD if args.analyzer_threshold is None else args.analyzer_threshold,
+        DEFAULT_THRESHOLD if args.translator_threshold is None else args.translator_threshold,
+    )
+
+
+def main() -> None:
+    """Parse the arguments, and run the daemon until it is interrupted."""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Watch folders for receipt scans.")
+    parser.add_argument("directories", nargs="+", type=Path, help="The directories to watch.")
+    parser.add_argument("--output", type=Path, default=Path("receipts"), help="The directory of the results.")
+    parser.add_argument("--state", type=Path, default=Path("ingest-state.json"), help="The progress file.")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds a scan should stay unchanged.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between two directory checks.")
+    parser.add_argument("--workers", type=int, default=None, help="The size of the process pool.")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per scan in the LLM stages.")
+    parser.add_argument("--retry-delay", type=float, default=30.0, help="Seconds before a failed scan is retried.")
+    parser.add_argument("--polling", action="store_true", help="Poll the directories instead of using inotify.")
+    parser.add_argument("--source-words", type=Path, help="The word list of the receipt language. Enables the gate.")
+    parser.add_argument("--target-words", type=Path, help="The word list of the target language. Enables the gate.")
+    parser.add_argument(
+        "--analyzer-threshold",
+        type=float,
+        default=None,
+        help=f"The confidence to skip the analyzer. Defaults to {DEFAULT_THRESHOLD} with a word list.",
+    )
+    parser.add_argument(
+        "--translator-threshold",
+        type=float,
+        default=None,
+        help=f"The confidence to skip the translator. Defaults to {DEFAULT_THRESHOLD} with a word list.",
+    )
+    args: argparse.Namespace = parser.parse_args()
+    gate: StageGate | None = build_gate(args, parser)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    daemon: IngestDaemon = IngestDaemon(
+        args.directories,
+        args.output,
+        args.state,
+        settle_seconds=args.settle,
+        poll_interval=args.interval,
+        workers=args.workers,
+        job_timeout=args.timeout,
+        polling=args.polling,
+        gate=gate,
+        retry_delay=args.retry_delay,
+    )
+
+    def handle_signal(_signum: int, _frame: FrameType | None) -> None:
+        daemon.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""
+This module runs the folder-watch ingestion daemon.
+
+The daemon watches the directories for new receipt scans. Once a scan
+has settled, it is hashed, checked and decoded in a process pool, and
+only the scans that pass are queued for the LLM stages. The LLM stages
+run one job at a time on their own thread, and every outcome is written
+to the progress ledger, so a restarted daemon continues where it left.
+
+A failed scan is retried after a delay that doubles with each failure.
+Failures of the LLM server itself, such as an outage or a refused
+connection, do not count as attempts of the scan, and are not written
+to the ledger. A scan that runs out of its deadline counts as an
+attempt, since a scan that is too long for the budget never finishes.
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from backend.ai import AssistantUnavailableError
+from backend.ai import Deadline
+from backend.ai import JobCancelledError
+from backend.ai import StageGate
+from backend.ai import run_pipeline
+from backend.ai.servicer import PipelineError
+from datatypes import Receipt
+from services.ingest.preparation import PreparedJob
+from services.ingest.preparation import prepare_image
+from services.ingest.progress import JobStatus
+from services.ingest.progress import ProgressLedger
+from services.ingest.watcher import Debouncer
+from services.ingest.watcher import DirectoryWatcher
+from services.ingest.watcher import create_watcher
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# The errors of the LLM server, which say nothing about the scan itself.
+INFRASTRUCTURE_ERRORS: tuple[type[Exception], ...] = (
+    AssistantUnavailableError,
+    ConnectionError,
+    httpx.TransportError,
+)
+MAX_RETRY_DELAY: float = 3600.0
+
+
+class IngestDaemon:
+    """This class watches directories and runs the pipeline over new scans."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        directories: list[Path],
+        output_dir: Path,
+        state_file: Path,
+        *,
+        settle_seconds: float = 2.0,
+        poll_interval: float = 1.0,
+        workers: int | None = None,
+        job_timeout: float | None = None,
+        polling: bool = False,
+        gate: StageGate | None = None,
+        retry_delay: float = 30.0,
+    ) -> None:
+        """Construct the daemon.
+
+        :param directories: The directories to watch, non-recursively.
+        :param output_dir: The directory to write the receipts as JSON.
+        :param state_file: The JSON file that persists the progress.
+        :param settle_seconds: The seconds a scan should stay unchanged before it is taken.
+        :param poll_interval: The seconds between two checks of the directories.
+        :param workers: The size of the process pool. Defaults to the CPU count.
+        :param job_timeout: The budget of the LLM stages per scan in seconds.
+        :param polling: Force polling even if inotify is available.
+        :param gate: The gate that decides which LLM stages to skip. Defaults to running every stage.
+        :param retry_delay: The seconds before a failed scan is retried, doubled per failure.
+        """
+        self._directories: list[Path] = directories
+        self._output_dir: Path = output_dir
+        self._poll_interval: float = poll_interval
+        self._workers: int | None = workers
+        self._job_timeout: float | None = job_timeout
+        self._polling: bool = polling
+        self._gate: StageGate | None = gate
+        self._retry_delay: float = retry_delay
+
+        self._ledger: ProgressLedger = ProgressLedger(state_file)
+        self._debouncer: Debouncer = Debouncer(settle_seconds)
+        self._ready_jobs: queue.Queue[PreparedJob | None] = queue.Queue()
+        self._inflight: set[Path] = set()
+        self._inflight_lock: threading.Lock = threading.Lock()
+        # The failed paths map to their failure count, and the time to retry them.
+        self._failures: dict[Path, int] = {}
+        self._retry_at: dict[Path, float] = {}
+        self._stopped: threading.Event = threading.Event()
+        self._deadline: Deadline | None = None
+
+    def run(self) -> None:
+        """Watch the directories until the daemon is stopped."""
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        watcher: DirectoryWatcher = create_watcher(self._directories, polling=self._polling)
+        logger.info("Watching %s with %s.", self._directories, type(watcher).__name__)
+
+        with ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            llm_thread: threading.Thread = threading.Thread(target=self._run_llm_stages, name="llm")
+            llm_thread.start()
+            try:
+                # The scans dropped while the daemon was down have no events.
+                for path in watcher.scan():
+                    self._observe(path)
+
+                while not self._stopped.is_set():
+                    for path in watcher.poll(self._poll_interval):
+                        self._observe(path)
+                    # The watchers report no event when a retry is due.
+                    for path in self._due_retries():
+                        self._observe(path)
+                    for path in self._debouncer.ready():
+                        self._prepare(pool, path)
+            finally:
+                self._stopped.set()
+                watcher.close()
+                self._ready_jobs.put(None)
+                llm_thread.join()
+
+    def stop(self) -> None:
+        """Stop the daemon, and cancel the job in the LLM stages.
+
+        It is safe to call from any thread, or from a signal handler.
+        """
+        self._stopped.set()
+        deadline: Deadline | None = self._deadline
+        if deadline is not None:
+            deadline.cancel()
+
+    def _observe(self, path: Path) -> None:
+        """Pass a changed file to the debouncer, unless it is known, taken or waiting to be retried."""
+        with self._inflight_lock:
+            if path in self._inflight or path in self._retry_at:
+                return
+        if not self._ledger.is_known(path):
+            self._debouncer.observe(path)
+
+    def _prepare(self, pool: ProcessPoolExecutor, path: Path) -> None:
+        """Submit a settled file to the process pool."""
+        with self._inflight_lock:
+            if path in self._inflight:
+                return
+            self._inflight.add(path)
+        future: Future[PreparedJob] = pool.submit(prepare_image, str(path))
+        future.add_done_callback(lambda done: self._on_prepared(path, done))
+
+    def _on_prepared(self, path: Path, future: Future[PreparedJob]) -> None:
+        """Queue a prepared job for the LLM stages, or record why it is not."""
+        try:
+            job: PreparedJob = future.result()
+        except FileNotFoundError:
+            logger.info("Skipped %s, it has been removed.", path)
+            self._release(path)
+            return
+        except Exception:
+            logger.exception("Preparing %s has failed.", path)
+            self._defer(path)
+            self._release(path)
+            return
+
+        if self._ledger.is_finished(job.sha256):
+            logger.info("Skipped %s, its content is already processed.", path)
+            self._ledger.link(job.path, job.size, job.mtime_ns, job.sha256)
+            self._forget_failures(path)
+            self._release(path)
+        elif not job.ready:
+            logger.warning("Rejected %s: %s", path, job.error)
+            self._ledger.record(job.path, job.size, job.mtime_ns, job.sha256, JobStatus.REJECTED, job.error)
+            self._forget_failures(path)
+            self._release(path)
+        else:
+            self._ready_jobs.put(job)
+
+    def _run_llm_stages(self) -> None:
+        """Run the pipeline over the ready jobs, one at a time."""
+        while (job := self._ready_jobs.get()) is not None and not self._stopped.is_set():
+            # A copy of the same scan may have finished while this job was queued.
+            if self._ledger.is_finished(job.sha256):
+                self._ledger.link(job.path, job.size, job.mtime_ns, job.sha256)
+                self._forget_failures(Path(job.path))
+                self._release(Path(job.path))
+                continue
+
+            self._deadline = Deadline(self._job_timeout)
+            if self._stopped.is_set():
+                self._deadline.cancel()
+            try:
+                receipt: Receipt = run_pipeline(job.path, deadline=self._deadline, gate=self._gate)
+                output_file: Path = self._write_result(job, receipt)
+            except JobCancelledError:
+                logger.info("Cancelled %s.", job.path)
+            except INFRASTRUCTURE_ERRORS as err:
+                logger.warning("Postponed %s, the LLM server has failed: %s", job.path, err)
+                self._defer(Path(job.path))
+            except (PipelineError, Exception) as err:
+                logger.warning("Failed %s: %s", job.path, err)
+                self._ledger.record(job.path, job.size, job.mtime_ns, job.sha256, JobStatus.FAILED, str(err))
+                self._defer(Path(job.path))
+            else:
+                logger.info("Processed %s into %s.", job.path, output_file)
+                self._ledger.record(job.path, job.size, job.mtime_ns, job.sha256, JobStatus.DONE, str(output_file))
+                self._forget_failures(Path(job.path))
+            finally:
+                self._deadline = None
+                self._release(Path(job.path))
+
+    def _write_result(self, job: PreparedJob, receipt: Receipt) -> Path:
+        """Write the receipt next to the other results atomically."""
+        output_file: Path = self._output_dir / f"{Path(job.path).stem}-{job.sha256[:12]}.json"
+        temporary_file: Path = output_file.with_name(f".{output_file.name}.tmp")
+        temporary_file.write_text(receipt.model_dump_json(indent=2), encoding="utf-8")
+        temporary_file.replace(output_file)
+        return output_file
+
+    def _defer(self, path: Path) -> None:
+        """Hold a failed file back for a delay that doubles with each failure."""
+        with self._inflight_lock:
+            failures: int = self._failures.get(path, 0) + 1
+            delay: float = min(self._retry_delay * 2 ** (failures - 1), MAX_RETRY_DELAY)
+            self._failures[path] = failures
+            self._retry_at[path] = time.monotonic() + delay
+        logger.info("Retrying %s in %.0f s.", path, delay)
+
+    def _due_retries(self) -> list[Path]:
+        """Return the failed files whose delay is over, and stop holding them back."""
+        now: float = time.monotonic()
+        with self._inflight_lock:
+            due: list[Path] = [path for path, retry_at in self._retry_at.items() if retry_at <= now]
+            for path in due:
+                del self._retry_at[path]
+        return due
+
+    def _forget_failures(self, path: Path) -> None:
+        """Reset the delay of a file whose job has finished."""
+        with self._inflight_lock:
+            self._failures.pop(path, None)
+            self._retry_at.pop(path, None)
+
+    def _release(self, path: Path) -> None:
+        """Forget that a file is taken, so that its changes are observed again."""
+        with self._inflight_lock:
+            self._inflight.discard(path)
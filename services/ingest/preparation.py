@@ -0,0 +1,87 @@
+"""
+This module holds the CPU-bound steps of the ingestion jobs.
+
+The functions run in a process pool, so they are top-level functions
+that take and return picklable values. A file is hashed, its format is
+checked from its signature and its headers are decoded before the job
+is passed to the LLM stages. The responses of the LLM stages are
+validated by the assistants, as each stage needs the result of the one
+before it.
+
+A file that cannot be read, such as a directory or a file without read
+permission, fails the same way on every try, so it is rejected as well.
+It has no content to hash, so its job is keyed by its path and its
+modification time instead.
+"""
+
+import hashlib
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from backend.ai.images import decode_image_size
+from backend.ai.images import detect_image_format
+
+
+class PreparedJob(BaseModel):
+    """This class holds the result of preparing a receipt scan."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    image_format: str | None
+    width: int | None
+    height: int | None
+    error: str | None
+
+    @property
+    def ready(self) -> bool:
+        """This property tells if the job can be passed to the LLM stages."""
+        return self.error is None
+
+
+def prepare_image(path: str) -> PreparedJob:
+    """Hash, check and decode a receipt scan.
+
+    :param path: The path to the scan.
+    :raise FileNotFoundError: The scan has been removed.
+    :return: The prepared job. The error field tells why a scan is rejected.
+    """
+    file_path: Path = Path(path)
+    stat = file_path.stat()
+    try:
+        data: bytes = file_path.read_bytes()
+    except FileNotFoundError:
+        raise
+    except OSError as err:
+        return PreparedJob(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=hashlib.sha256(f"{path}:{stat.st_mtime_ns}".encode()).hexdigest(),
+            image_format=None,
+            width=None,
+            height=None,
+            error=f"The scan cannot be read: {err.strerror}.",
+        )
+
+    image_format: str | None = detect_image_format(data)
+    width: int | None = None
+    height: int | None = None
+    error: str | None = None
+    try:
+        width, height = decode_image_size(data)
+    except ValueError as err:
+        error = str(err)
+
+    return PreparedJob(
+        path=path,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        sha256=hashlib.sha256(data).hexdigest(),
+        image_format=image_format,
+        width=width,
+        height=height,
+        error=error,
+    )
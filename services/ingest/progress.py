@@ -0,0 +1,125 @@
+"""
+This module persists the progress of the ingestion daemon.
+
+Jobs are recorded by the SHA-256 of their content, so a renamed or a
+copied scan is not processed twice. The paths are recorded with their
+size and modification time as well, which lets the daemon skip a known
+file on restart without reading it again. The ledger is written to a
+temporary file and renamed over the previous one, so a crash never
+leaves a half-written ledger behind.
+"""
+
+import json
+import os
+import threading
+from enum import StrEnum
+from enum import unique
+from pathlib import Path
+from typing import Any
+
+
+@unique
+class JobStatus(StrEnum):
+    """This enum holds the outcomes of an ingestion job."""
+
+    DONE = "done"
+    REJECTED = "rejected"
+    FAILED = "failed"
+
+
+class ProgressLedger:
+    """A thread-safe record of the processed scans, persisted as JSON."""
+
+    def __init__(self, state_file: Path, max_attempts: int = 3) -> None:
+        """Load the ledger from the state file, if it exists.
+
+        :param state_file: The JSON file that holds the progress.
+        :param max_attempts: The number of times a failing job is tried.
+        """
+        self._state_file: Path = state_file
+        self._max_attempts: int = max_attempts
+        self._lock: threading.Lock = threading.Lock()
+        self._files: dict[str, dict[str, Any]] = {}
+        self._jobs: dict[str, dict[str, Any]] = {}
+
+        if state_file.exists():
+            with Path.open(state_file, "r", encoding="utf-8") as f:
+                state: dict[str, Any] = json.load(f)
+            self._files = state.get("files", {})
+            self._jobs = state.get("jobs", {})
+
+    def is_finished(self, sha256: str) -> bool:
+        """Tell if the job of the given content should not run again.
+
+        :param sha256: The content hash of the scan.
+        :return: True if the job is done, rejected, or out of attempts.
+        """
+        with self._lock:
+            job: dict[str, Any] | None = self._jobs.get(sha256)
+        if job is None:
+            return False
+        if job["status"] == JobStatus.FAILED:
+            return job["attempts"] >= self._max_attempts
+        return True
+
+    def is_known(self, path: Path) -> bool:
+        """Tell if an unchanged file has a finished job, without reading it.
+
+        :param path: The file path.
+        :return: True if the file is unchanged since its job has finished.
+        """
+        with self._lock:
+            entry: dict[str, Any] | None = self._files.get(str(path))
+        if entry is None:
+            return False
+        try:
+            stat: os.stat_result = path.stat()
+        except FileNotFoundError:
+            return False
+        unchanged: bool = entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+        return unchanged and self.is_finished(entry["sha256"])
+
+    def record(  # noqa: PLR0913
+        self,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        sha256: str,
+        status: JobStatus,
+        detail: str | None = None,
+    ) -> None:
+        """Record the outcome of a job, and persist the ledger.
+
+        :param path: The path of the scan.
+        :param size: The size of the scan in bytes.
+        :param mtime_ns: The modification time of the scan.
+        :param sha256: The content hash of the scan.
+        :param status: The outcome of the job.
+        :param detail: The result file, or the error message.
+        """
+        with self._lock:
+            attempts: int = self._jobs.get(sha256, {}).get("attempts", 0)
+            self._files[path] = {"size": size, "mtime_ns": mtime_ns, "sha256": sha256}
+            self._jobs[sha256] = {"status": status, "attempts": attempts + 1, "detail": detail}
+            self._save()
+
+    def link(self, path: str, size: int, mtime_ns: int, sha256: str) -> None:
+        """Record a path whose content already has a finished job.
+
+        :param path: The path of the scan.
+        :param size: The size of the scan in bytes.
+        :param mtime_ns: The modification time of the scan.
+        :param sha256: The content hash of the scan.
+        """
+        with self._lock:
+            self._files[path] = {"size": size, "mtime_ns": mtime_ns, "sha256": sha256}
+            self._save()
+
+    def _save(self) -> None:
+        """Write the ledger atomically. The caller holds the lock."""
+        temporary_file: Path = self._state_file.with_name(f".{self._state_file.name}.tmp")
+        with Path.open(temporary_file, "w", encoding="utf-8") as f:
+            json.dump({"files": self._files, "jobs": self._jobs}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        temporary_file.replace(self._state_file)
@@ -0,0 +1,225 @@
+"""
+This module watches the ingestion directories for new receipt scans.
+
+Inotify is used where the platform provides it, and the directories are
+polled otherwise. Either way, a file is only reported as ready once its
+size and modification time have stopped changing for a while, so that
+scans that are still being copied into the folder are not picked up.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from abc import ABC
+from abc import abstractmethod
+from pathlib import Path
+
+IN_CLOSE_WRITE: int = 0x00000008
+IN_MOVED_TO: int = 0x00000080
+IN_CREATE: int = 0x00000100
+IN_Q_OVERFLOW: int = 0x00004000
+IN_ISDIR: int = 0x40000000
+IN_EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+IN_READ_SIZE: int = 64 * 1024
+
+
+def is_candidate(path: Path) -> bool:
+    """Tell if a file in a watched directory may be a receipt scan.
+
+    Hidden files and the temporary files of downloads and editors are ignored.
+
+    :param path: The file path.
+    :return: True if the file should be observed.
+    """
+    return not path.name.startswith(".") and not path.name.endswith((".part", ".tmp", ".crdownload", "~"))
+
+
+class DirectoryWatcher(ABC):
+    """This class is a base class for the directory watchers."""
+
+    def __init__(self, directories: list[Path]) -> None:
+        """Construct a watcher for the given directories.
+
+        :param directories: The directories to watch, non-recursively.
+        """
+        self._directories: list[Path] = directories
+
+    def scan(self) -> set[Path]:
+        """List the candidate files in the watched directories.
+
+        :return: The paths of the candidate files.
+        """
+        return {
+            entry
+            for directory in self._directories
+            for entry in directory.iterdir()
+            if entry.is_file() and is_candidate(entry)
+        }
+
+    @abstractmethod
+    def poll(self, timeout: float) -> set[Path]:
+        """Wait for changes in the watched directories.
+
+        :param timeout: The maximum seconds to wait.
+        :return: The paths that may have changed.
+        """
+        error_msg: str = "Abstract Method is not implemented yet."
+        raise NotImplementedError(error_msg)
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release the resources of the watcher."""
+        error_msg: str = "Abstract Method is not implemented yet."
+        raise NotImplementedError(error_msg)
+
+
+class PollingWatcher(DirectoryWatcher):
+    """A watcher that lists the directories on every poll."""
+
+    def poll(self, timeout: float) -> set[Path]:
+        """Sleep for the timeout, and report every candidate file.
+
+        :param timeout: The seconds to sleep.
+        :return: The paths of the candidate files.
+        """
+        time.sleep(timeout)
+        return self.scan()
+
+    def close(self) -> None:
+        """Release nothing, the polling watcher holds no resources."""
+
+
+class InotifyWatcher(DirectoryWatcher):
+    """A watcher that receives the file events from the Linux kernel."""
+
+    def __init__(self, directories: list[Path]) -> None:
+        """Construct a watcher, and add an inotify watch per directory.
+
+        :param directories: The directories to watch, non-recursively.
+        :raise OSError: Inotify is not available on the platform.
+        """
+        super().__init__(directories)
+        if not sys.platform.startswith("linux"):
+            error_msg: str = "Inotify is only available on Linux."
+            raise OSError(error_msg)
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 has failed.")
+
+        self._watches: dict[int, Path] = {}
+        # The debouncer follows the writes, so the write events are not needed.
+        mask: int = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        for directory in directories:
+            wd: int = libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+            if wd < 0:
+                errno: int = ctypes.get_errno()
+                os.close(self._fd)
+                raise OSError(errno, f"inotify_add_watch has failed for {directory}.")
+            self._watches[wd] = directory
+
+    def poll(self, timeout: float) -> set[Path]:
+        """Wait for the inotify events of the watched directories.
+
+        When the kernel event queue overflows, the lost events are replaced
+        with a full scan of the directories. The events of subdirectories
+        are ignored, as the directories are watched non-recursively.
+
+        :param timeout: The maximum seconds to wait.
+        :return: The candidate paths named in the events.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            buffer: bytes = os.read(self._fd, IN_READ_SIZE)
+        except BlockingIOError:
+            return set()
+
+        paths: set[Path] = set()
+        offset: int = 0
+        while offset + IN_EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = IN_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += IN_EVENT_HEADER.size
+            if mask & IN_Q_OVERFLOW:
+                paths |= self.scan()
+                continue
+            name: bytes = buffer[offset : offset + length].rstrip(b"\x00")
+            offset += length
+            if name and wd in self._watches and not mask & IN_ISDIR:
+                path: Path = self._watches[wd] / os.fsdecode(name)
+                if is_candidate(path):
+                    paths.add(path)
+        return paths
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        os.close(self._fd)
+
+
+def create_watcher(directories: list[Path], *, polling: bool = False) -> DirectoryWatcher:
+    """Create an inotify watcher, or a polling one if inotify is not available.
+
+    :param directories: The directories to watch, non-recursively.
+    :param polling: Force the polling watcher.
+    :return: A directory watcher.
+    """
+    if not polling:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(directories)
+
+
+class Debouncer:
+    """This class reports the files that have stopped changing."""
+
+    def __init__(self, settle_seconds: float) -> None:
+        """Construct a debouncer.
+
+        :param settle_seconds: The seconds a file should stay unchanged.
+        """
+        self._settle_seconds: float = settle_seconds
+        # The path maps to its (size, mtime) and the time it was last changed.
+        self._pending: dict[Path, tuple[tuple[int, int], float]] = {}
+
+    def observe(self, path: Path) -> None:
+        """Record the current state of a file.
+
+        :param path: The file path.
+        """
+        try:
+            stat: os.stat_result = path.stat()
+        except FileNotFoundError:
+            self._pending.pop(path, None)
+            return
+
+        stamp: tuple[int, int] = (stat.st_size, stat.st_mtime_ns)
+        previous: tuple[tuple[int, int], float] | None = self._pending.get(path)
+        if previous is None or previous[0] != stamp:
+            self._pending[path] = (stamp, time.monotonic())
+
+    def ready(self) -> list[Path]:
+        """Return the files that are unchanged for the settle time, and forget them.
+
+        :return: The paths of the settled files.
+        """
+        for path in list(self._pending):
+            self.observe(path)
+
+        now: float = time.monotonic()
+        settled: list[Path] = [
+            path
+            for path, (stamp, changed_at) in self._pending.items()
+            if stamp[0] > 0 and now - changed_at >= self._settle_seconds
+        ]
+        for path in settled:
+            del self._pending[path]
+        return settled